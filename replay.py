@@ -0,0 +1,104 @@
+import argparse
+import asyncio
+import json
+import os
+
+LOCAL_MONGO_URL = "mongodb://localhost:27017"
+
+
+def compare_reports(base: dict, new: dict) -> list[tuple[str, float, float]]:
+    """Пары значений метрик двух прогонов: задержка, расхождения с записью, операции БД."""
+    rows = [
+        (f"latency_ms.{key}", base["latency_ms"][key], new["latency_ms"][key])
+        for key in base["latency_ms"]
+    ]
+    rows.extend(
+        (key, base.get(key, 0), new.get(key, 0))
+        for key in (
+            "frames_sent",
+            "frames_skipped",
+            "frames_failed",
+            "frames_delivered",
+            "frames_unmatched",
+            "frames_system",
+            "frames_history",
+            "connections_failed",
+            "connections_closed_by_server",
+        )
+    )
+    rows.append(("db_ops_total", base["db_ops_total"], new["db_ops_total"]))
+    for command in sorted(set(base["db_ops"]) | set(new["db_ops"])):
+        rows.append(
+            (
+                f"db_ops.{command}",
+                base["db_ops"].get(command, 0),
+                new["db_ops"].get(command, 0),
+            )
+        )
+    return rows
+
+
+def run_replay(args: argparse.Namespace):
+    # Настройки подключения приложения не используются: базу задает --mongo-url.
+    os.environ.setdefault("MONGO_HOST", "localhost")
+    os.environ.setdefault("MONGO_PORT", "27017")
+    from src.services.traffic_replay import TrafficReplay
+
+    replay = TrafficReplay(args.log, args.mongo_url, args.speed)
+    report = asyncio.run(replay.run())
+    output = json.dumps(report, ensure_ascii=False, indent=2)
+    if args.report:
+        with open(args.report, "w", encoding="utf-8") as file:
+            file.write(output)
+    print(output)
+
+
+def run_compare(args: argparse.Namespace):
+    with open(args.base, encoding="utf-8") as file:
+        base = json.load(file)
+    with open(args.new, encoding="utf-8") as file:
+        new = json.load(file)
+
+    print(f"{'metric':<32}{'base':>12}{'new':>12}{'diff':>10}")
+    for metric, base_value, new_value in compare_reports(base, new):
+        diff = (
+            f"{(new_value - base_value) / base_value * 100:+.1f}%"
+            if base_value
+            else "-"
+        )
+        print(f"{metric:<32}{base_value:>12}{new_value:>12}{diff:>10}")
+
+
+def main():
+    parser = argparse.ArgumentParser(
+        description="Воспроизведение записанного трафика чата и сравнение прогонов."
+    )
+    subparsers = parser.add_subparsers(required=True)
+
+    replay_parser = subparsers.add_parser("replay", help="воспроизвести лог трафика")
+    replay_parser.add_argument("log", help="путь к логу (.jsonl или .jsonl.gz)")
+    replay_parser.add_argument(
+        "--speed",
+        type=float,
+        default=1.0,
+        help="ускорение воспроизведения, 0 - без пауз между событиями",
+    )
+    replay_parser.add_argument(
+        "--mongo-url",
+        default=LOCAL_MONGO_URL,
+        help="локальная MongoDB, в которой создается временная база для прогона",
+    )
+    replay_parser.add_argument("--report", help="файл для сохранения отчета")
+    replay_parser.set_defaults(handler=run_replay)
+
+    compare_parser = subparsers.add_parser("compare", help="сравнить два отчета")
+    compare_parser.add_argument("base")
+    compare_parser.add_argument("new")
+    compare_parser.set_defaults(handler=run_compare)
+
+    args = parser.parse_args()
+    args.handler(args)
+
+
+if __name__ == "__main__":
+    main()
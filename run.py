@@ -2,10 +2,13 @@ import uvicorn
 
 from src import create_app
 from src.db.mongo_db import connect_to_mongodb
+from src.services.traffic_capture import recorder
 
 app = create_app()
 
 app.add_event_handler("startup", connect_to_mongodb)
+app.add_event_handler("startup", recorder.open)
+app.add_event_handler("shutdown", recorder.close)
 
 
 if __name__ == '__main__':
@@ -7,6 +7,7 @@ from starlette.templating import Jinja2Templates
 from src.api.schemas.message_schema import SendMessage
 from src.models.user_models import User
 from src.services.message_service import MessageService
+from src.services.traffic_capture import CONNECT, DISCONNECT, MESSAGE, recorder
 from src.services.websocket_logic import get_user_by_token, manager
 
 chat_router = APIRouter(
@@ -27,6 +28,8 @@ async def websocket_endpoint(
     websocket: WebSocket, user: User = Depends(get_user_by_token)
 ):
     await manager.connect(websocket, user.username)
+    connection_id = recorder.next_connection_id()
+    recorder.record(CONNECT, user.username, connection_id)
     last_messages = await MessageService.get_last_messages_for_user(user.username)
     for message in last_messages:
         formatted_time = message.created_at.strftime("%d/%m/%y %H:%M")
@@ -36,6 +39,7 @@ async def websocket_endpoint(
     try:
         while True:
             data = await websocket.receive_text()
+            recorder.record(MESSAGE, user.username, connection_id, data)
             if data.startswith("/pm"):
                 _, receiver, message_text = data.split(" ", 2)
                 if receiver == user.username:
@@ -62,4 +66,5 @@ async def websocket_endpoint(
                 formatted_message = f"[{formatted_time}] {user.username}: {data}"
                 await manager.broadcast(formatted_message)
     except WebSocketDisconnect:
+        recorder.record(DISCONNECT, user.username, connection_id)
         manager.disconnect(user.username)
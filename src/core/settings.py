@@ -19,6 +19,7 @@ class Settings(BaseSettings):
     MONGO_DB: str = "mongo_message"
     MONGO_USER: str = ""
     MONGO_PASS: str = ""
+    TRAFFIC_CAPTURE_PATH: str = ""
 
     @property
     def mongo_url(self) -> str:
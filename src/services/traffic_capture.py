@@ -0,0 +1,169 @@
+import asyncio
+import gzip
+import itertools
+import json
+import logging
+import time
+import zlib
+from typing import IO, Iterator, Optional
+
+from src.core.settings import settings
+
+SESSION = "s"
+CONNECT = "c"
+MESSAGE = "m"
+DISCONNECT = "d"
+
+FLUSH_INTERVAL = 1.0
+GZIP_MAGIC = b"\x1f\x8b\x08"
+
+
+def open_traffic_log(path: str, mode: str) -> IO[str]:
+    if path.endswith(".gz"):
+        return gzip.open(path, mode + "t", encoding="utf-8")
+    return open(path, mode, encoding="utf-8")
+
+
+def read_gzip_log(path: str) -> str:
+    """Распаковка лога с пропуском оборванных gzip-блоков после аварийной остановки."""
+    with open(path, "rb") as log:
+        data = log.read()
+
+    chunks = []
+    position = data.find(GZIP_MAGIC)
+    while position != -1:
+        decompressor = zlib.decompressobj(wbits=31)
+        start = position
+        end = data.find(GZIP_MAGIC, start + 1)
+        while True:
+            piece = data[start:end] if end != -1 else data[start:]
+            try:
+                chunks.append(decompressor.decompress(piece))
+            except zlib.error:
+                break
+            if decompressor.eof or end == -1:
+                break
+            start, end = end, data.find(GZIP_MAGIC, end + 1)
+
+        if decompressor.eof:
+            member_end = start + len(piece) - len(decompressor.unused_data)
+            position = data.find(GZIP_MAGIC, member_end)
+        elif start != position:
+            position = start
+        else:
+            position = end
+
+    return b"".join(chunks).decode("utf-8", errors="replace")
+
+
+def read_traffic_log(path: str) -> Iterator[dict]:
+    """Чтение событий из лога.
+
+    Событие: {"t": мс от начала записи, "e": тип, "i": номер соединения,
+    "u": username, "d": текст}.
+
+    Сессии (запуски сервиса) склеиваются в одну шкалу времени,
+    оборванные строки пропускаются.
+    """
+    if path.endswith(".gz"):
+        lines = read_gzip_log(path).splitlines()
+    else:
+        with open(path, encoding="utf-8", errors="replace") as log:
+            lines = log.read().splitlines()
+
+    session_offset = 0.0
+    last_time = 0.0
+    for line in lines:
+        try:
+            event = json.loads(line)
+        except json.JSONDecodeError:
+            continue
+        if not isinstance(event, dict) or "t" not in event or "e" not in event:
+            continue
+        if event["e"] == SESSION:
+            session_offset = last_time
+        event["t"] += session_offset
+        last_time = event["t"]
+        yield event
+
+
+class TrafficRecorder:
+    def __init__(self, path: str):
+        self.path = path
+        self._log: Optional[IO[str]] = None
+        self._started_at: float = 0.0
+        self._flush_handle: Optional[asyncio.TimerHandle] = None
+        self._connection_ids = itertools.count(1)
+
+    def open(self):
+        """Открытие лога при старте сервиса, ошибка пути останавливает запуск."""
+        if not self.path or self._log is not None:
+            return
+        self._log = open_traffic_log(self.path, "a")
+        self._started_at = time.monotonic()
+        self._log.write('\n{"t":0,"e":"%s"}\n' % SESSION)
+
+    def next_connection_id(self) -> int:
+        return next(self._connection_ids)
+
+    def record(
+        self,
+        event: str,
+        username: str,
+        connection_id: int,
+        data: Optional[str] = None,
+    ):
+        if self._log is None:
+            return
+
+        entry = {
+            "t": round((time.monotonic() - self._started_at) * 1000, 1),
+            "e": event,
+            "i": connection_id,
+            "u": username,
+        }
+        if data is not None:
+            entry["d"] = data
+        line = json.dumps(entry, ensure_ascii=False, separators=(",", ":"))
+        try:
+            self._log.write(line + "\n")
+        except OSError:
+            self.disable()
+            return
+
+        if self._flush_handle is None:
+            self._flush_handle = asyncio.get_running_loop().call_later(
+                FLUSH_INTERVAL, self.flush
+            )
+
+    def flush(self):
+        self._flush_handle = None
+        if self._log is None:
+            return
+        try:
+            self._log.flush()
+        except OSError:
+            self.disable()
+
+    def disable(self):
+        logging.exception("Traffic capture to %s disabled", self.path)
+        self.path = ""
+        log, self._log = self._log, None
+        try:
+            log.close()
+        except OSError:
+            pass
+
+    def close(self):
+        if self._flush_handle is not None:
+            self._flush_handle.cancel()
+            self._flush_handle = None
+        if self._log is not None:
+            try:
+                self._log.close()
+            except OSError:
+                logging.exception("Failed to close traffic capture %s", self.path)
+            self._log = None
+
+
+recorder = TrafficRecorder(settings.TRAFFIC_CAPTURE_PATH)
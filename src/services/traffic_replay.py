@@ -0,0 +1,311 @@
+import asyncio
+import socket
+import threading
+import time
+from collections import Counter
+from datetime import timedelta
+from typing import Optional
+from uuid import uuid4
+
+import uvicorn
+import websockets
+from beanie import init_beanie
+from motor.motor_asyncio import AsyncIOMotorClient
+from pymongo import monitoring
+
+from src import create_app
+from src.core.secure import create_access_token, get_password
+from src.models.message_model import Message
+from src.models.user_models import User
+from src.services.traffic_capture import (
+    CONNECT,
+    DISCONNECT,
+    MESSAGE,
+    SESSION,
+    read_traffic_log,
+    recorder,
+)
+
+DRAIN_TIMEOUT = 1.0
+HISTORY_LIMIT = 20
+
+
+class CommandCounter(monitoring.CommandListener):
+    """Подсчет команд, отправленных драйвером в MongoDB."""
+
+    def __init__(self):
+        self.counts: Counter = Counter()
+        self.lock = threading.Lock()
+
+    def started(self, event: monitoring.CommandStartedEvent):
+        with self.lock:
+            self.counts[event.command_name] += 1
+
+    def reset(self):
+        with self.lock:
+            self.counts.clear()
+
+    def get_counts(self) -> dict[str, int]:
+        with self.lock:
+            return dict(self.counts)
+
+    def succeeded(self, event: monitoring.CommandSucceededEvent):
+        pass
+
+    def failed(self, event: monitoring.CommandFailedEvent):
+        pass
+
+
+class ReplayClient:
+    def __init__(
+        self, username: str, websocket, sent_snapshot: dict[str, int], history: int
+    ):
+        self.username = username
+        self.websocket = websocket
+        self.cursors = sent_snapshot
+        self.history_left = history
+        self.reader: Optional[asyncio.Task] = None
+        self.closed_by_client = False
+
+
+def get_expected_fragment(sender: str, data: str) -> Optional[str]:
+    """Часть отформатированного сообщения после времени, которую получат адресаты."""
+    if data.startswith("/pm"):
+        parts = data.split(" ", 2)
+        if len(parts) < 3 or parts[1] == sender:
+            return None
+        _, receiver, text = parts
+        return f"] {sender} для {receiver}: {text}"
+    return f"] {sender}: {data}"
+
+
+def get_percentile(values: list[float], percent: float) -> float:
+    if not values:
+        return 0.0
+    index = min(len(values) - 1, round(percent / 100 * (len(values) - 1)))
+    return values[index]
+
+
+def get_free_port() -> int:
+    with socket.socket() as sock:
+        sock.bind(("127.0.0.1", 0))
+        return sock.getsockname()[1]
+
+
+class TrafficReplay:
+    def __init__(self, log_path: str, mongo_url: str, speed: float = 1.0):
+        self.events = list(read_traffic_log(log_path))
+        self.mongo_url = mongo_url
+        self.speed = speed
+        self.counter = CommandCounter()
+        self.db_name = f"replay_{uuid4().hex[:8]}"
+        self.server_mongo_client: Optional[AsyncIOMotorClient] = None
+        self.messages = None
+        self.tokens: dict[str, str] = {}
+        self.clients: dict[int, ReplayClient] = {}
+        self.sent: dict[str, list[float]] = {}
+        self.latencies: list[float] = []
+        self.frames_sent = 0
+        self.frames_skipped = 0
+        self.frames_failed = 0
+        self.frames_unmatched = 0
+        self.frames_system = 0
+        self.frames_history = 0
+        self.connections_failed = 0
+        self.connections_closed_by_server = 0
+
+    async def seed_users(self):
+        """Создание отправителей и получателей /pm из лога.
+
+        Лог не хранит, существовал ли получатель: /pm несуществующему
+        пользователю в сервисе обрывает соединение отправителя,
+        а при воспроизведении сообщение сохраняется и доставляется.
+        """
+        usernames = set()
+        for event in self.events:
+            if event["e"] == CONNECT:
+                usernames.add(event["u"])
+            data = event.get("d", "")
+            if event["e"] == MESSAGE and data.startswith("/pm"):
+                parts = data.split(" ", 2)
+                if len(parts) == 3:
+                    usernames.add(parts[1])
+
+        hashed_password = get_password(uuid4().hex)
+        for index, username in enumerate(sorted(usernames)):
+            user = User(
+                username=username,
+                email=f"replay{index}@example.com",
+                hashed_password=hashed_password,
+            )
+            await user.save()
+            self.tokens[username] = create_access_token(user.user_id, timedelta(days=1))
+
+    async def read_frames(self, client: ReplayClient):
+        try:
+            async for frame in client.websocket:
+                received_at = time.monotonic()
+                marker = frame.find("] ")
+                if marker == -1:
+                    self.frames_system += 1
+                    continue
+                fragment = frame[marker:]
+                if client.history_left and " для " in fragment:
+                    client.history_left -= 1
+                    self.frames_history += 1
+                    continue
+                sent_times = self.sent.get(fragment, [])
+                cursor = client.cursors.get(fragment, 0)
+                if cursor < len(sent_times):
+                    self.latencies.append((received_at - sent_times[cursor]) * 1000)
+                    client.cursors[fragment] = cursor + 1
+                else:
+                    self.frames_unmatched += 1
+        except websockets.ConnectionClosed:
+            pass
+        if not client.closed_by_client:
+            self.connections_closed_by_server += 1
+
+    async def count_history(self, username: str) -> int:
+        """Число сообщений, которые сервер отправит из истории при подключении."""
+        return await self.messages.count_documents(
+            {"$or": [{"sender_username": username}, {"receiver_username": username}]},
+            limit=HISTORY_LIMIT,
+        )
+
+    async def connect(self, ws_url: str, connection_id: int, username: str):
+        history = await self.count_history(username)
+        try:
+            websocket = await websockets.connect(
+                f"{ws_url}?token={self.tokens[username]}"
+            )
+        except (OSError, websockets.InvalidHandshake):
+            self.connections_failed += 1
+            return
+        snapshot = {fragment: len(times) for fragment, times in self.sent.items()}
+        client = ReplayClient(username, websocket, snapshot, history)
+        client.reader = asyncio.create_task(self.read_frames(client))
+        self.clients[connection_id] = client
+
+    async def disconnect(self, connection_id: int):
+        client = self.clients.pop(connection_id, None)
+        if client is not None:
+            client.closed_by_client = True
+            await client.websocket.close()
+            await client.reader
+
+    async def send(self, connection_id: int, data: str):
+        client = self.clients.get(connection_id)
+        if client is None:
+            self.frames_skipped += 1
+            return
+        fragment = get_expected_fragment(client.username, data)
+        if fragment is not None:
+            self.sent.setdefault(fragment, []).append(time.monotonic())
+        try:
+            await client.websocket.send(data)
+        except websockets.ConnectionClosed:
+            if fragment is not None:
+                self.sent[fragment].pop()
+            self.frames_failed += 1
+            return
+        self.frames_sent += 1
+
+    async def play(self, ws_url: str):
+        started_at = time.monotonic()
+        for event in self.events:
+            if self.speed > 0:
+                delay = started_at + event["t"] / 1000 / self.speed - time.monotonic()
+                if delay > 0:
+                    await asyncio.sleep(delay)
+
+            if event["e"] == CONNECT:
+                await self.connect(ws_url, event["i"], event["u"])
+            elif event["e"] == MESSAGE:
+                await self.send(event["i"], event["d"])
+            elif event["e"] == DISCONNECT:
+                await self.disconnect(event["i"])
+            elif event["e"] == SESSION:
+                for connection_id in list(self.clients):
+                    await self.disconnect(connection_id)
+
+        await asyncio.sleep(DRAIN_TIMEOUT)
+        for connection_id in list(self.clients):
+            await self.disconnect(connection_id)
+
+    async def start_database(self):
+        self.server_mongo_client = AsyncIOMotorClient(
+            self.mongo_url, event_listeners=[self.counter]
+        )
+        await init_beanie(
+            database=self.server_mongo_client[self.db_name],
+            document_models=[User, Message],
+        )
+        await self.seed_users()
+
+    def stop_database(self):
+        if self.server_mongo_client is not None:
+            self.server_mongo_client.close()
+
+    async def run(self) -> dict:
+        """Прогон лога против приложения, запущенного в отдельном потоке.
+
+        Сервер работает в собственном event loop, чтобы задержка доставки
+        не включала ожидание клиентов воспроизведения в общем цикле.
+        """
+        recorder.path = ""
+        app = create_app()
+        app.add_event_handler("startup", self.start_database)
+        app.add_event_handler("shutdown", self.stop_database)
+        port = get_free_port()
+        server = uvicorn.Server(
+            uvicorn.Config(app, host="127.0.0.1", port=port, log_level="warning")
+        )
+        server_thread = threading.Thread(target=server.run)
+        mongo_client = AsyncIOMotorClient(self.mongo_url)
+        self.messages = mongo_client[self.db_name][Message.Settings.name]
+        try:
+            server_thread.start()
+            try:
+                while not server.started:
+                    if not server_thread.is_alive():
+                        raise RuntimeError("Replay server failed to start")
+                    await asyncio.sleep(0.05)
+                self.counter.reset()
+                await self.play(f"ws://127.0.0.1:{port}/messenger/ws/")
+                db_ops = self.counter.get_counts()
+            finally:
+                server.should_exit = True
+                await asyncio.to_thread(server_thread.join)
+        finally:
+            try:
+                await mongo_client.drop_database(self.db_name)
+            finally:
+                mongo_client.close()
+
+        return self.get_report(db_ops)
+
+    def get_report(self, db_ops: dict[str, int]) -> dict:
+        latencies = sorted(self.latencies)
+        return {
+            "speed": self.speed,
+            "events": len(self.events),
+            "frames_sent": self.frames_sent,
+            "frames_skipped": self.frames_skipped,
+            "frames_failed": self.frames_failed,
+            "frames_delivered": len(latencies),
+            "frames_unmatched": self.frames_unmatched,
+            "frames_system": self.frames_system,
+            "frames_history": self.frames_history,
+            "connections_failed": self.connections_failed,
+            "connections_closed_by_server": self.connections_closed_by_server,
+            "latency_ms": {
+                "mean": round(sum(latencies) / len(latencies), 3) if latencies else 0.0,
+                "p50": round(get_percentile(latencies, 50), 3),
+                "p95": round(get_percentile(latencies, 95), 3),
+                "p99": round(get_percentile(latencies, 99), 3),
+                "max": round(latencies[-1], 3) if latencies else 0.0,
+            },
+            "db_ops": db_ops,
+            "db_ops_total": sum(db_ops.values()),
+        }
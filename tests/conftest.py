@@ -0,0 +1,4 @@
+import os
+
+os.environ.setdefault("MONGO_HOST", "localhost")
+os.environ.setdefault("MONGO_PORT", "27017")
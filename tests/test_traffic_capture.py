@@ -0,0 +1,92 @@
+import gzip
+import json
+import zlib
+
+from src.services.traffic_capture import read_traffic_log
+
+
+def dump(*events: dict) -> str:
+    return "".join(json.dumps(event) + "\n" for event in events)
+
+
+def test_truncated_gzip_member_followed_by_new_member(tmp_path):
+    compressor = zlib.compressobj(wbits=31)
+    truncated = compressor.compress(
+        dump({"t": 0, "e": "s"}, {"t": 5, "e": "c", "i": 1, "u": "alice"}).encode()
+    )
+    truncated += compressor.flush(zlib.Z_SYNC_FLUSH)
+    complete = gzip.compress(
+        (
+            "\n" + dump({"t": 0, "e": "s"}, {"t": 3, "e": "c", "i": 1, "u": "bob"})
+        ).encode()
+    )
+    path = tmp_path / "traffic.jsonl.gz"
+    path.write_bytes(truncated + complete)
+
+    events = list(read_traffic_log(str(path)))
+
+    assert [(event["e"], event.get("u")) for event in events] == [
+        ("s", None),
+        ("c", "alice"),
+        ("s", None),
+        ("c", "bob"),
+    ]
+
+
+def test_truncated_gzip_tail(tmp_path):
+    data = gzip.compress(
+        dump(
+            *({"t": i, "e": "m", "i": 1, "u": "a", "d": "x"} for i in range(100))
+        ).encode()
+    )
+    path = tmp_path / "traffic.jsonl.gz"
+    path.write_bytes(data[: len(data) - 10])
+
+    events = list(read_traffic_log(str(path)))
+
+    assert [event["t"] for event in events] == list(range(len(events)))
+
+
+def test_partial_trailing_line_is_skipped(tmp_path):
+    path = tmp_path / "traffic.jsonl"
+    path.write_text(
+        dump({"t": 0, "e": "s"}, {"t": 1, "e": "c", "i": 1, "u": "alice"})
+        + '{"t": 2, "e": "m", "i"'
+    )
+
+    events = list(read_traffic_log(str(path)))
+
+    assert [event["e"] for event in events] == ["s", "c"]
+
+
+def test_partial_line_before_next_session(tmp_path):
+    path = tmp_path / "traffic.jsonl"
+    path.write_text(
+        dump({"t": 0, "e": "s"})
+        + '{"t": 2, "e": "m", "i"'
+        + "\n"
+        + dump({"t": 0, "e": "s"}, {"t": 1, "e": "c", "i": 1, "u": "bob"})
+    )
+
+    events = list(read_traffic_log(str(path)))
+
+    assert [event["e"] for event in events] == ["s", "s", "c"]
+
+
+def test_sessions_are_joined_into_one_timeline(tmp_path):
+    path = tmp_path / "traffic.jsonl"
+    path.write_text(
+        dump(
+            {"t": 0, "e": "s"},
+            {"t": 100, "e": "c", "i": 1, "u": "alice"},
+            {"t": 250, "e": "d", "i": 1, "u": "alice"},
+            {"t": 0, "e": "s"},
+            {"t": 40, "e": "c", "i": 1, "u": "bob"},
+            {"t": 0, "e": "s"},
+            {"t": 10, "e": "c", "i": 1, "u": "carol"},
+        )
+    )
+
+    events = list(read_traffic_log(str(path)))
+
+    assert [event["t"] for event in events] == [0, 100, 250, 250, 290, 290, 300]
@@ -0,0 +1,67 @@
+import asyncio
+
+from src.services.traffic_replay import (
+    ReplayClient,
+    TrafficReplay,
+    get_expected_fragment,
+)
+
+
+class FakeWebSocket:
+    def __init__(self, frames: list[str]):
+        self.frames = frames
+
+    def __aiter__(self):
+        return self
+
+    async def __anext__(self):
+        if not self.frames:
+            raise StopAsyncIteration
+        return self.frames.pop(0)
+
+
+def test_broadcast_fragment():
+    assert get_expected_fragment("alice", "hello all") == "] alice: hello all"
+
+
+def test_private_message_fragment():
+    assert (
+        get_expected_fragment("alice", "/pm bob see you soon")
+        == "] alice для bob: see you soon"
+    )
+
+
+def test_private_message_to_oneself_has_no_fragment():
+    assert get_expected_fragment("alice", "/pm alice note") is None
+
+
+def test_malformed_private_message_has_no_fragment():
+    assert get_expected_fragment("alice", "/pm bob") is None
+    assert get_expected_fragment("alice", "/pm") is None
+
+
+def test_read_frames_classifies_frames(tmp_path):
+    log = tmp_path / "traffic.jsonl"
+    log.write_text("")
+    replay = TrafficReplay(str(log), "mongodb://localhost:27017")
+    replay.sent = {"] bob для alice: ok": [0.0, 0.0], "] bob: hi": [0.0]}
+    websocket = FakeWebSocket(
+        [
+            "[19/10/26 10:00] bob для alice: ok",
+            "[19/10/26 10:01] bob: hi",
+            "[19/10/26 10:02] bob для alice: ok",
+            "Вы не можете отправлять личные сообщения себе.",
+            "[19/10/26 10:03] bob для alice: ok",
+            "[19/10/26 10:04] bob для alice: ok",
+        ]
+    )
+    client = ReplayClient("alice", websocket, {}, history=1)
+    client.closed_by_client = True
+
+    asyncio.run(replay.read_frames(client))
+
+    assert replay.frames_history == 1
+    assert len(replay.latencies) == 3
+    assert replay.frames_system == 1
+    assert replay.frames_unmatched == 1
+    assert replay.connections_closed_by_server == 0